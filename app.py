@@ -1,13 +1,35 @@
 import streamlit as st
+import pandas as pd
 import os
 import datetime
+import hashlib
 from components import file_uploader, report_generator, dashboard, ai_analysis, data_filter, report_storage
 import database as db
 
+# Copy-on-Write: los subconjuntos filtrados comparten memoria con el DataFrame original
+# en lugar de copiarlo, y nunca lo modifican por accidente
+pd.options.mode.copy_on_write = True
+
 # Create necessary directories if they don't exist
 for dir_path in ["data/raw", "data/processed"]:
     os.makedirs(dir_path, exist_ok=True)
 
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_report_list():
+    """Listado de informes guardados en la base de datos, cacheado por 30 segundos."""
+    return db.list_reports()
+
+@st.cache_data(show_spinner=False)
+def _load_project_zip():
+    """Contenido del ZIP del proyecto, leído del disco una sola vez."""
+    with open("proyecto_analisis_datos_2.zip", "rb") as f:
+        return f.read()
+
+def _frame_hash(df):
+    """Huella del contenido de un DataFrame, para detectar si cambió entre reejecuciones."""
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hashlib.sha1(str(list(df.columns)).encode() + row_hashes.tobytes()).hexdigest()
+
 # Set page config
 st.set_page_config(
     page_title="Herramienta de Análisis de Datos Operacionales",
@@ -50,6 +72,7 @@ with st.sidebar:
                         st.session_state.analysis if 'analysis' in st.session_state else None
                     )
                     if success:
+                        _cached_report_list.clear()
                         st.success("¡Informe guardado exitosamente!")
                     else:
                         st.error("Error al guardar el informe.")
@@ -74,6 +97,7 @@ with st.sidebar:
                 st.session_state.metrics = loaded_data["metrics"]
                 st.session_state.analysis = loaded_data["analysis"]
                 st.session_state.selected_date = selected_saved_date
+                st.session_state.pop('df_hash', None)
                 st.success(f"Informe del {selected_saved_date.strftime('%Y-%m-%d')} cargado!")
                 st.rerun()
             else:
@@ -87,6 +111,16 @@ if 'filtered_df' in st.session_state:
     if 'selected_date' in st.session_state:
         st.subheader(f"Datos para: {st.session_state.selected_date.strftime('%Y-%m-%d')}")
     
+    # Recalculate metrics and analysis only when the filtered data changes
+    df_hash = _frame_hash(st.session_state.filtered_df)
+    if st.session_state.get('df_hash') != df_hash:
+        st.session_state.metrics = report_generator.generate_metrics(st.session_state.filtered_df)
+        st.session_state.analysis = ai_analysis.generate_analysis(
+            st.session_state.filtered_df, 
+            st.session_state.metrics
+        )
+        st.session_state.df_hash = df_hash
+    
     # Tabs for different views
     tab1, tab2, tab3, tab4, tab5 = st.tabs(["Informe", "Dashboard", "Análisis IA", "Base de Datos", "Descargar Proyecto"])
     
@@ -94,9 +128,7 @@ if 'filtered_df' in st.session_state:
         # Report view
         if 'filtered_df' in st.session_state:
             st.subheader("Informe Operacional")
-            metrics = report_generator.generate_metrics(st.session_state.filtered_df)
-            st.session_state.metrics = metrics
-            report_generator.display_report(st.session_state.filtered_df, metrics)
+            report_generator.display_report(st.session_state.filtered_df, st.session_state.metrics)
     
     with tab2:
         # Dashboard view
@@ -108,31 +140,26 @@ if 'filtered_df' in st.session_state:
         # AI Analysis view
         if 'filtered_df' in st.session_state and 'metrics' in st.session_state:
             st.subheader("Análisis de Inteligencia Artificial")
-            analysis = ai_analysis.generate_analysis(
-                st.session_state.filtered_df, 
-                st.session_state.metrics
-            )
-            st.session_state.analysis = analysis
-            ai_analysis.display_analysis(analysis)
+            ai_analysis.display_analysis(st.session_state.analysis)
     
     with tab4:
         # Database info view
         st.subheader("Información de la Base de Datos")
         st.write("Esta aplicación utiliza PostgreSQL para almacenar los informes y análisis generados.")
         
-        # Obtener las fechas de informes guardados
-        saved_dates = db.get_saved_report_dates_from_db()
+        # Obtener el listado de informes guardados
+        report_list = _cached_report_list()
+        saved_dates = report_list['date'].tolist()
         
         if saved_dates:
             st.success(f"Hay {len(saved_dates)} informes guardados en la base de datos.")
             
             # Mostrar informes en una tabla
-            date_strings = [date.strftime('%Y-%m-%d') for date in saved_dates]
-            
-            import pandas as pd
             df_reports = pd.DataFrame({
-                "Fecha": date_strings,
-                "Acción": ["Ver" for _ in range(len(date_strings))]
+                "Fecha": [date.strftime('%Y-%m-%d') for date in saved_dates],
+                "Creado": report_list['created_at'],
+                "Archivo": report_list['filename'],
+                "Tamaño (KB)": (report_list['size'] / 1024).round(1)
             })
             
             st.dataframe(df_reports)
@@ -150,6 +177,8 @@ if 'filtered_df' in st.session_state:
             with col2:
                 if st.button("Eliminar Informe Seleccionado"):
                     if db.delete_report_from_db(selected_date_to_delete):
+                        _cached_report_list.clear()
+                        report_storage.clear_saved_report_dates()
                         st.success(f"Informe del {selected_date_to_delete.strftime('%Y-%m-%d')} eliminado exitosamente.")
                         st.rerun()
                     else:
@@ -165,20 +194,21 @@ if 'filtered_df' in st.session_state:
             Base de Datos: {os.environ.get('PGDATABASE', 'No disponible')}
             """)
             
-            # Ejecutar una consulta simple para verificar la conexión
-            try:
-                from sqlalchemy import text
-                with db.engine.connect() as connection:
-                    result = connection.execute(text("SELECT 1"))
-                    row = result.fetchone()
-                    if row and row[0] == 1:
-                        st.success("Conexión a la base de datos establecida correctamente.")
-                        st.info("La base de datos PostgreSQL proporciona almacenamiento persistente para todos los informes generados.")
-                    else:
-                        st.warning("La conexión a la base de datos parece incompleta.")
-            except Exception as e:
-                st.error(f"Error al conectar a la base de datos: {str(e)}")
-                st.info("Mientras tanto, los informes se guardarán localmente como respaldo.")
+            # Ejecutar una consulta simple para verificar la conexión solo bajo demanda
+            if st.button("Probar Conexión"):
+                try:
+                    from sqlalchemy import text
+                    with db.get_engine().connect() as connection:
+                        result = connection.execute(text("SELECT 1"))
+                        row = result.fetchone()
+                        if row and row[0] == 1:
+                            st.success("Conexión a la base de datos establecida correctamente.")
+                            st.info("La base de datos PostgreSQL proporciona almacenamiento persistente para todos los informes generados.")
+                        else:
+                            st.warning("La conexión a la base de datos parece incompleta.")
+                except Exception as e:
+                    st.error(f"Error al conectar a la base de datos: {str(e)}")
+                    st.info("Mientras tanto, los informes se guardarán localmente como respaldo.")
     
     with tab5:
         # Pestaña para descargar el proyecto
@@ -196,15 +226,13 @@ if 'filtered_df' in st.session_state:
         """)
         
         # Cargar el archivo ZIP y crear un botón de descarga
-        import base64
-        
         try:
-            with open("proyecto_analisis_datos_2.zip", "rb") as f:
-                zip_data = f.read()
-                b64 = base64.b64encode(zip_data).decode()
-                
-            href = f'<a href="data:application/zip;base64,{b64}" download="proyecto_analisis_datos.zip">⬇️ Descargar Proyecto Completo (.zip)</a>'
-            st.markdown(href, unsafe_allow_html=True)
+            st.download_button(
+                label="⬇️ Descargar Proyecto Completo (.zip)",
+                data=_load_project_zip(),
+                file_name="proyecto_analisis_datos.zip",
+                mime="application/zip"
+            )
             
             st.success("El archivo contiene todo el código fuente y estructura necesaria para ejecutar la aplicación.")
             
@@ -3,11 +3,15 @@ import pandas as pd
 import numpy as np
 import os
 from datetime import datetime, timedelta
+from components.column_types import classify_columns
 
+@st.cache_data(ttl=300, show_spinner=False)
 def generate_analysis(df, metrics):
     """
     Generates AI analysis of the data.
     
+    Results are cached for 5 minutes, keyed on the DataFrame and metrics.
+    
     Args:
         df: The pandas DataFrame containing the filtered data
         metrics: Dictionary of metrics
@@ -31,91 +35,81 @@ def generate_analysis(df, metrics):
     analysis['summary'] = f"Analysis based on {record_count} records."
     
     # Get numeric columns for analysis
-    numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+    column_types = classify_columns(df)
+    numeric_cols = column_types['numeric']
     
     # Skip if no numeric data
     if not numeric_cols:
         analysis['summary'] += " No numeric data available for detailed analysis."
         return analysis
     
-    # Identify trends in numeric columns
-    for col in numeric_cols:
-        # Skip if we don't have metrics for this column
-        if col not in metrics:
-            continue
-        
-        col_metrics = metrics[col]
-        
-        # Check if there's enough data for trend analysis
-        if col_metrics['count'] < 3:
-            continue
-        
-        # Check for basic trends (high variance might indicate trend)
-        if col_metrics['std'] > 0.5 * col_metrics['mean'] and col_metrics['mean'] != 0:
-            analysis['trends'].append(f"High variability detected in {col} (coefficient of variation: {col_metrics['std']/col_metrics['mean']:.2f}).")
-    
-    # Check for anomalies (outliers)
-    for col in numeric_cols:
-        # Skip if we don't have metrics for this column
-        if col not in metrics:
-            continue
+    # Only analyse the columns we have metrics for
+    metric_cols = [col for col in numeric_cols if col in metrics]
+    
+    if metric_cols:
+        means = np.array([metrics[col]['mean'] for col in metric_cols], dtype='float64')
+        stds = np.array([metrics[col]['std'] for col in metric_cols], dtype='float64')
         
-        col_metrics = metrics[col]
+        # Count outliers (values beyond 3 standard deviations) for every column at once
+        values = df[metric_cols].to_numpy(dtype='float64', na_value=np.nan)
+        outlier_counts = ((values > means + 3 * stds) | (values < means - 3 * stds)).sum(axis=0)
         
-        # Simple outlier detection: values beyond 3 standard deviations
-        if col_metrics['std'] > 0:
-            upper_bound = col_metrics['mean'] + 3 * col_metrics['std']
-            lower_bound = col_metrics['mean'] - 3 * col_metrics['std']
+        # Identify trends and anomalies in a single pass over the columns
+        for col, outlier_count in zip(metric_cols, outlier_counts):
+            col_metrics = metrics[col]
             
-            # Count outliers
-            outliers = df[(df[col] > upper_bound) | (df[col] < lower_bound)]
-            outlier_count = len(outliers)
+            # Check for basic trends (high variance might indicate trend) if there's enough data
+            if col_metrics['count'] >= 3 and col_metrics['std'] > 0.5 * col_metrics['mean'] and col_metrics['mean'] != 0:
+                analysis['trends'].append(f"High variability detected in {col} (coefficient of variation: {col_metrics['std']/col_metrics['mean']:.2f}).")
             
-            if outlier_count > 0:
+            # Simple outlier detection
+            if col_metrics['std'] > 0 and outlier_count > 0:
                 percentage = (outlier_count / col_metrics['count']) * 100
                 analysis['anomalies'].append(f"Found {outlier_count} outliers ({percentage:.1f}%) in {col}.")
     
     # Generate insights based on the data
     # 1. Look for correlations between numeric columns
     if len(numeric_cols) > 1:
-        corr_matrix = df[numeric_cols].corr()
+        corr_matrix = df[numeric_cols].corr().to_numpy()
         
         # Find strong correlations (>0.7 or <-0.7)
-        for i in range(len(numeric_cols)):
-            for j in range(i+1, len(numeric_cols)):
-                if abs(corr_matrix.iloc[i, j]) > 0.7:
-                    col1 = numeric_cols[i]
-                    col2 = numeric_cols[j]
-                    corr = corr_matrix.iloc[i, j]
-                    
-                    if corr > 0:
-                        analysis['insights'].append(f"Strong positive correlation ({corr:.2f}) found between {col1} and {col2}.")
-                    else:
-                        analysis['insights'].append(f"Strong negative correlation ({corr:.2f}) found between {col1} and {col2}.")
+        for i, j, corr in zip(*_strong_correlations(corr_matrix, 0.7)):
+            col1 = numeric_cols[i]
+            col2 = numeric_cols[j]
+            
+            if corr > 0:
+                analysis['insights'].append(f"Strong positive correlation ({corr:.2f}) found between {col1} and {col2}.")
+            else:
+                analysis['insights'].append(f"Strong negative correlation ({corr:.2f}) found between {col1} and {col2}.")
     
     # 2. Identify largest contributors
     # For each numeric column, find categories that contribute most to the total
-    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    categorical_cols = column_types['categorical']
     
     if categorical_cols:
+        top_numeric_cols = numeric_cols[:3]  # Limit to first 3 numeric columns
+        totals = df[top_numeric_cols].sum()
+        
         for cat_col in categorical_cols[:2]:  # Limit to first 2 categorical columns
-            for num_col in numeric_cols[:3]:  # Limit to first 3 numeric columns
-                # Group by category and sum the numeric value
-                grouped = df.groupby(cat_col)[num_col].sum().reset_index()
+            # Group by category once and sum all the numeric values together
+            grouped = df.groupby(cat_col, observed=True, sort=False)[top_numeric_cols].sum()
+            
+            if grouped.empty:
+                continue
+            
+            # Get the top contributor of each numeric column
+            top_categories = grouped.idxmax()
+            contributions = grouped.max()
+            
+            for num_col in top_numeric_cols:
+                total = totals[num_col]
                 
-                # Sort and get top contributor
-                if not grouped.empty:
-                    grouped = grouped.sort_values(num_col, ascending=False)
-                    top_category = grouped.iloc[0][cat_col]
-                    contribution = grouped.iloc[0][num_col]
-                    total = df[num_col].sum()
-                    
-                    if total > 0:
-                        percentage = (contribution / total) * 100
-                        analysis['insights'].append(f"{top_category} accounts for {percentage:.1f}% of total {num_col}.")
+                if total > 0:
+                    percentage = (contributions[num_col] / total) * 100
+                    analysis['insights'].append(f"{top_categories[num_col]} accounts for {percentage:.1f}% of total {num_col}.")
     
     # Time-based analysis if date columns exist
-    date_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
+    date_cols = column_types['datetime']
     
     if date_cols and numeric_cols:
         date_col = date_cols[0]  # Use first date column
@@ -124,26 +118,30 @@ def generate_analysis(df, metrics):
         unique_dates = df[date_col].dt.date.nunique()
         
         if unique_dates > 1:
-            # Sort by date
-            df_sorted = df.sort_values(date_col)
+            # Locate the first and last date without sorting the whole frame
+            first_pos = df[date_col].argmin()
+            last_pos = df[date_col].argmax()
             
             # Get first and last date
-            first_date = df_sorted[date_col].iloc[0]
-            last_date = df_sorted[date_col].iloc[-1]
+            first_date = df[date_col].iat[first_pos]
+            last_date = df[date_col].iat[last_pos]
             
             # Check if there's a clear time trend
-            for num_col in numeric_cols[:3]:  # Limit to first 3 numeric columns
-                first_value = df_sorted[num_col].iloc[0]
-                last_value = df_sorted[num_col].iloc[-1]
+            trend_cols = numeric_cols[:3]  # Limit to first 3 numeric columns
+            first_values, last_values = df.iloc[[first_pos, last_pos]][trend_cols].to_numpy(dtype='float64', na_value=np.nan)
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                change_pcts = (last_values - first_values) / np.where(first_values == 0, np.nan, first_values) * 100
+            
+            # Only report significant changes
+            for k in np.flatnonzero(np.abs(change_pcts) > 10):
+                num_col = trend_cols[k]
+                change_pct = change_pcts[k]
                 
-                if first_value != 0:
-                    change_pct = ((last_value - first_value) / first_value) * 100
-                    
-                    if abs(change_pct) > 10:  # Only report significant changes
-                        if change_pct > 0:
-                            analysis['trends'].append(f"{num_col} increased by {change_pct:.1f}% from {first_date.date()} to {last_date.date()}.")
-                        else:
-                            analysis['trends'].append(f"{num_col} decreased by {abs(change_pct):.1f}% from {first_date.date()} to {last_date.date()}.")
+                if change_pct > 0:
+                    analysis['trends'].append(f"{num_col} increased by {change_pct:.1f}% from {first_date.date()} to {last_date.date()}.")
+                else:
+                    analysis['trends'].append(f"{num_col} decreased by {abs(change_pct):.1f}% from {first_date.date()} to {last_date.date()}.")
     
     # Generate summary statement
     if analysis['trends'] or analysis['anomalies'] or analysis['insights']:
@@ -162,6 +160,25 @@ def generate_analysis(df, metrics):
     
     return analysis
 
+def _strong_correlations(corr_matrix, threshold):
+    """
+    Finds the pairs of columns whose correlation exceeds a threshold.
+    
+    Only the upper triangle of the matrix is scanned, so each pair is
+    reported once. The threshold test runs as a single NumPy operation
+    and only the matching cells are gathered.
+    
+    Args:
+        corr_matrix: Square NumPy array of correlation coefficients
+        threshold: Minimum absolute correlation to report
+        
+    Returns:
+        Tuple of arrays (row indices, column indices, correlation values)
+    """
+    strong = np.triu(np.abs(corr_matrix) > threshold, k=1)
+    i_idx, j_idx = np.nonzero(strong)
+    return i_idx, j_idx, corr_matrix[i_idx, j_idx]
+
 def display_analysis(analysis):
     """
     Displays the AI analysis results.
@@ -0,0 +1,39 @@
+import streamlit as st
+
+def classify_columns(df):
+    """
+    Classifies the columns of a DataFrame by data type, plus the programmed
+    ('prog') and actual ('real') columns by name.
+
+    The classification only depends on the column names and dtypes, so it
+    is cached on an empty slice of the DataFrame and computed once per
+    schema instead of on every rerun.
+
+    Args:
+        df: The pandas DataFrame to classify
+
+    Returns:
+        Dictionary with the 'numeric', 'categorical', 'datetime', 'prog' and
+        'real' column lists
+    """
+    return _classify_schema(df.iloc[:0])
+
+@st.cache_data(show_spinner=False)
+def _classify_schema(schema_df):
+    """
+    Runs the dtype selection for classify_columns.
+
+    Args:
+        schema_df: An empty DataFrame with the columns and dtypes to classify
+
+    Returns:
+        Dictionary with the 'numeric', 'categorical', 'datetime', 'prog' and
+        'real' column lists
+    """
+    return {
+        'numeric': schema_df.select_dtypes(include=['number']).columns.tolist(),
+        'categorical': schema_df.select_dtypes(include=['object', 'category']).columns.tolist(),
+        'datetime': schema_df.select_dtypes(include=['datetime64']).columns.tolist(),
+        'prog': [col for col in schema_df.columns if 'prog' in str(col).lower()],
+        'real': [col for col in schema_df.columns if 'real' in str(col).lower()]
+    }
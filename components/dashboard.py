@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 from plotly import graph_objects
 from plotly.subplots import make_subplots
+from components.column_types import classify_columns
+from components.data_filter import apply_filters
 
 def render_dashboard(df):
     """
@@ -18,33 +21,35 @@ def render_dashboard(df):
     # Create filters
     st.sidebar.header("Filtros del Dashboard")
     
+    # Classify the columns once for the filters and all the charts
+    column_types = classify_columns(df)
+    
     # Get categorical columns for filtering
-    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    categorical_cols = column_types['categorical']
     
     # Add filters for up to 3 categorical columns
+    filter_columns = categorical_cols[:3]
+    filter_options = _unique_filter_values(df[filter_columns]) if filter_columns else {}
+    
     filter_values = {}
-    for i, col in enumerate(categorical_cols[:3]):
+    for col, unique_values in filter_options.items():
         try:
-            if col in df.columns:  # Check if column exists
-                if len(df[col].dropna().unique()) < 50:  # Only add filter if not too many unique values
-                    unique_values = sorted(df[col].dropna().unique().tolist())
-                    if unique_values:  # Check if we have any values after dropping NA
-                        selected_values = st.sidebar.multiselect(
-                            f"Filtrar por {col}",
-                            options=unique_values,
-                            default=unique_values
-                        )
-                        
-                        if selected_values:
-                            filter_values[col] = selected_values
+            unique_values = sorted(unique_values)
+            if unique_values:  # Check if we have any values after dropping NA
+                selected_values = st.sidebar.multiselect(
+                    f"Filtrar por {col}",
+                    options=unique_values,
+                    default=unique_values
+                )
+                
+                if selected_values:
+                    filter_values[col] = selected_values
         except Exception as e:
             st.warning(f"Error al procesar columna {col}: {str(e)}")
             continue
     
-    # Apply filters if any
-    filtered_df = df.copy()
-    for col, values in filter_values.items():
-        filtered_df = filtered_df[filtered_df[col].isin(values)]
+    # Apply filters if any, combining them into a single mask
+    filtered_df = apply_filters(df, filter_values) if filter_values else df
     
     # Main dashboard area
     st.subheader("Dashboard Visualizations")
@@ -58,26 +63,60 @@ def render_dashboard(df):
     tab1, tab2, tab3 = st.tabs(["Overview", "Trends", "Comparisons"])
     
     with tab1:
-        render_overview_charts(filtered_df)
+        render_overview_charts(filtered_df, column_types)
     
     with tab2:
-        render_trend_charts(filtered_df)
+        render_trend_charts(filtered_df, column_types)
     
     with tab3:
-        render_comparison_charts(filtered_df)
+        render_comparison_charts(filtered_df, column_types)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _unique_filter_values(df):
+    """
+    Gets the unique non-null values of each categorical filter column.
+    
+    Args:
+        df: DataFrame with the categorical columns to filter on
+        
+    Returns:
+        Dictionary of {column: list of unique values}, skipping columns with
+        50 or more unique values
+    """
+    filter_options = {}
+    
+    for col in df.columns:
+        series = df[col]
+        
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Map the codes present in the data back to their categories
+            codes = series.cat.codes.to_numpy()
+            unique_values = series.cat.categories.to_numpy()[np.unique(codes[codes >= 0])]
+        else:
+            unique_values = pd.unique(series.to_numpy())
+            unique_values = unique_values[pd.notna(unique_values)]
+        
+        # Only add filter if not too many unique values
+        if len(unique_values) < 50:
+            filter_options[col] = unique_values.tolist()
+    
+    return filter_options
 
-def render_overview_charts(df):
+def render_overview_charts(df, column_types=None):
     """
     Renders overview charts for the dashboard.
     
     Args:
         df: The pandas DataFrame containing the filtered data
+        column_types: Column classification from classify_columns (optional)
     """
+    if column_types is None:
+        column_types = classify_columns(df)
+    
     st.subheader("Data Overview")
     
-    # Get numeric and date columns
-    numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-    date_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
+    # Get numeric columns
+    numeric_cols = column_types['numeric']
     
     if not numeric_cols:
         st.info("No hay columnas numéricas disponibles para visualización.")
@@ -94,42 +133,19 @@ def render_overview_charts(df):
                 options=numeric_cols
             )
             
-            fig = px.histogram(
-                df, 
-                x=selected_numeric,
-                title=f"Distribution of {selected_numeric}",
-                color_discrete_sequence=['#0078D7']
-            )
+            fig = _build_histogram(df[selected_numeric], selected_numeric)
             st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         # Pie chart for a categorical column
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+        categorical_cols = column_types['categorical']
         if categorical_cols:
             selected_cat = st.selectbox(
                 "Select categorical column for pie chart",
                 options=categorical_cols
             )
             
-            # Count values and get top 10 categories if there are many
-            value_counts = df[selected_cat].value_counts().reset_index()
-            value_counts.columns = [selected_cat, 'count']
-            
-            if len(value_counts) > 10:
-                # Keep top 10 and group others
-                top_10 = value_counts.iloc[:10]
-                others = pd.DataFrame({
-                    selected_cat: ['Others'],
-                    'count': [value_counts.iloc[10:]['count'].sum()]
-                })
-                value_counts = pd.concat([top_10, others])
-            
-            fig = px.pie(
-                value_counts, 
-                values='count', 
-                names=selected_cat,
-                title=f"Distribution by {selected_cat}"
-            )
+            fig = _build_pie_chart(df[selected_cat], selected_cat)
             st.plotly_chart(fig, use_container_width=True)
     
     # Summary statistics table
@@ -139,17 +155,21 @@ def render_overview_charts(df):
         summary_stats = df[numeric_cols].describe().transpose()
         st.dataframe(summary_stats.style.format("{:.2f}"))
 
-def render_trend_charts(df):
+def render_trend_charts(df, column_types=None):
     """
     Renders trend charts for the dashboard.
     
     Args:
         df: The pandas DataFrame containing the filtered data
+        column_types: Column classification from classify_columns (optional)
     """
+    if column_types is None:
+        column_types = classify_columns(df)
+    
     st.subheader("Trend Analysis")
     
     # Check if we have date columns for trend analysis
-    date_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
+    date_cols = column_types['datetime']
     
     if not date_cols:
         st.info("No date columns available for trend analysis.")
@@ -161,7 +181,7 @@ def render_trend_charts(df):
         options=date_cols
     )
     
-    numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+    numeric_cols = column_types['numeric']
     
     if not numeric_cols:
         st.info("No numeric columns available for trend analysis.")
@@ -186,57 +206,49 @@ def render_trend_charts(df):
         options=["Día", "Semana", "Mes"]
     )
     
-    # Prepare data for trend chart
-    df_copy = df.copy()
-    
-    # Create date groups based on selected aggregation
-    if agg_level == "Día":
-        df_copy['date_group'] = df_copy[selected_date].dt.date
-    elif agg_level == "Semana":
-        df_copy['date_group'] = df_copy[selected_date].dt.to_period('W').dt.start_time.dt.date
-    else:  # Mes
-        df_copy['date_group'] = df_copy[selected_date].dt.to_period('M').dt.start_time.dt.date
-    
-    # Aggregate data
-    agg_dict = {metric: 'mean' for metric in selected_metrics}
-    df_agg = df_copy.groupby('date_group').agg(agg_dict).reset_index()
+    fig = _build_trend_chart(df[[selected_date] + selected_metrics], selected_date, selected_metrics, agg_level)
+    st.plotly_chart(fig, use_container_width=True)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _aggregate_comparison(df, selected_cat, selected_metric):
+    """
+    Aggregates a metric by category for the comparison charts.
     
-    # Create trend chart
-    import plotly.graph_objects as go  # Importación local para evitar errores
-    fig = go.Figure()
+    Args:
+        df: The pandas DataFrame containing the filtered data
+        selected_cat: The categorical column to group by
+        selected_metric: The numeric column to aggregate
+        
+    Returns:
+        DataFrame with the mean and sum per category, top 10 by mean
+    """
+    comparison_data = df.groupby(selected_cat, observed=True, sort=False)[selected_metric].agg(['mean', 'sum']).reset_index()
     
-    for metric in selected_metrics:
-        fig.add_trace(
-            go.Scatter(
-                x=df_agg['date_group'],
-                y=df_agg[metric],
-                mode='lines+markers',
-                name=metric
-            )
-        )
+    # Sort by mean value
+    comparison_data = comparison_data.sort_values('mean', ascending=False)
     
-    fig.update_layout(
-        title=f"Análisis de Tendencia por {agg_level}",
-        xaxis_title="Fecha",
-        yaxis_title="Valor",
-        legend_title="Métricas",
-        hovermode="x unified"
-    )
+    # Limit to top 10 categories if there are too many
+    if len(comparison_data) > 10:
+        comparison_data = comparison_data.head(10)
     
-    st.plotly_chart(fig, use_container_width=True)
+    return comparison_data
 
-def render_comparison_charts(df):
+def render_comparison_charts(df, column_types=None):
     """
     Renders comparison charts for the dashboard.
     
     Args:
         df: The pandas DataFrame containing the filtered data
+        column_types: Column classification from classify_columns (optional)
     """
+    if column_types is None:
+        column_types = classify_columns(df)
+    
     st.subheader("Comparative Analysis")
     
     # Get categorical and numeric columns
-    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-    numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+    categorical_cols = column_types['categorical']
+    numeric_cols = column_types['numeric']
     
     if not categorical_cols or not numeric_cols:
         st.info("Need both categorical and numeric columns for comparison charts.")
@@ -258,15 +270,7 @@ def render_comparison_charts(df):
         )
     
     # Create comparison chart (bar chart)
-    # Aggregate data
-    comparison_data = df.groupby(selected_cat)[selected_metric].agg(['mean', 'sum']).reset_index()
-    
-    # Sort by mean value
-    comparison_data = comparison_data.sort_values('mean', ascending=False)
-    
-    # Limit to top 10 categories if there are too many
-    if len(comparison_data) > 10:
-        comparison_data = comparison_data.head(10)
+    comparison_data = _aggregate_comparison(df[[selected_cat, selected_metric]], selected_cat, selected_metric)
     
     # Choose which measure to display
     measure = st.radio(
@@ -276,7 +280,132 @@ def render_comparison_charts(df):
     )
     
     # Create bar chart
-    fig = px.bar(
+    fig = _build_bar_chart(comparison_data, selected_cat, selected_metric, measure)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Add a box plot for distribution comparison
+    st.subheader(f"Distribution of {selected_metric} by {selected_cat}")
+    
+    # Limit to top 5 categories for box plot clarity
+    top_categories = comparison_data[selected_cat].head(5).tolist()
+    fig = _build_box_plot(df[[selected_cat, selected_metric]], selected_cat, selected_metric, top_categories)
+    st.plotly_chart(fig, use_container_width=True)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _build_histogram(values, selected_numeric):
+    """
+    Builds the distribution histogram for a numeric column.
+    
+    Args:
+        values: The pandas Series to plot
+        selected_numeric: The numeric column name, passed explicitly so it
+            is part of the cache key
+        
+    Returns:
+        Plotly figure
+    """
+    return px.histogram(
+        values.rename(selected_numeric).to_frame(), 
+        x=selected_numeric,
+        title=f"Distribution of {selected_numeric}",
+        color_discrete_sequence=['#0078D7']
+    )
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _build_pie_chart(values, selected_cat):
+    """
+    Builds the pie chart for a categorical column, grouping everything
+    past the top 10 categories into 'Others'.
+    
+    Args:
+        values: The pandas Series to plot
+        selected_cat: The categorical column name, passed explicitly so it
+            is part of the cache key
+        
+    Returns:
+        Plotly figure
+    """
+    # Count values and get top 10 categories if there are many; categorical
+    # columns also report their absent categories with a count of 0
+    value_counts = values.value_counts()
+    value_counts = value_counts[value_counts > 0]
+    
+    if len(value_counts) > 10:
+        # Keep top 10 and group others
+        labels = np.where(np.arange(len(value_counts)) < 10, value_counts.index.astype(object), 'Others')
+        value_counts = value_counts.groupby(labels, sort=False).sum()
+    
+    value_counts = value_counts.rename_axis(selected_cat).reset_index(name='count')
+    
+    return px.pie(
+        value_counts, 
+        values='count', 
+        names=selected_cat,
+        title=f"Distribution by {selected_cat}"
+    )
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _build_trend_chart(df, selected_date, selected_metrics, agg_level):
+    """
+    Aggregates the selected metrics over time and builds the trend chart.
+    
+    Args:
+        df: DataFrame with the date column and the selected metrics
+        selected_date: The date column to group by
+        selected_metrics: List of numeric columns to plot
+        agg_level: Aggregation level ("Día", "Semana" or "Mes")
+        
+    Returns:
+        Plotly figure
+    """
+    # Create date groups based on selected aggregation
+    freq = {"Día": 'D', "Semana": 'W', "Mes": 'M'}[agg_level]
+    date_group = df[selected_date].dt.to_period(freq).rename('date_group')
+    
+    # Aggregate data
+    df_agg = df.groupby(date_group, observed=True, sort=True)[selected_metrics].mean().reset_index()
+    
+    # Plot each group at the start of its period
+    df_agg['date_group'] = df_agg['date_group'].dt.to_timestamp()
+    
+    # Create trend chart
+    fig = graph_objects.Figure()
+    
+    for metric in selected_metrics:
+        fig.add_trace(
+            graph_objects.Scatter(
+                x=df_agg['date_group'],
+                y=df_agg[metric],
+                mode='lines+markers',
+                name=metric
+            )
+        )
+    
+    fig.update_layout(
+        title=f"Análisis de Tendencia por {agg_level}",
+        xaxis_title="Fecha",
+        yaxis_title="Valor",
+        legend_title="Métricas",
+        hovermode="x unified"
+    )
+    
+    return fig
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _build_bar_chart(comparison_data, selected_cat, selected_metric, measure):
+    """
+    Builds the bar chart comparing a metric across categories.
+    
+    Args:
+        comparison_data: DataFrame from _aggregate_comparison
+        selected_cat: The categorical column
+        selected_metric: The numeric column
+        measure: The aggregate to plot ("mean" or "sum")
+        
+    Returns:
+        Plotly figure
+    """
+    return px.bar(
         comparison_data,
         x=selected_cat,
         y=measure,
@@ -284,22 +413,27 @@ def render_comparison_charts(df):
         color=measure,
         color_continuous_scale='Blues'
     )
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _build_box_plot(df, selected_cat, selected_metric, top_categories):
+    """
+    Builds the box plot of a metric for the top categories.
     
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Add a box plot for distribution comparison
-    st.subheader(f"Distribution of {selected_metric} by {selected_cat}")
-    
-    # Limit to top 5 categories for box plot clarity
-    top_categories = comparison_data[selected_cat].head(5).tolist()
+    Args:
+        df: DataFrame with the categorical and numeric columns
+        selected_cat: The categorical column
+        selected_metric: The numeric column
+        top_categories: List of categories to include
+        
+    Returns:
+        Plotly figure
+    """
     filtered_for_box = df[df[selected_cat].isin(top_categories)]
     
-    fig = px.box(
+    return px.box(
         filtered_for_box,
         x=selected_cat,
         y=selected_metric,
         title=f"Distribution of {selected_metric} by {selected_cat} (Top 5)",
         color=selected_cat
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
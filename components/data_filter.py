@@ -1,8 +1,14 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import datetime
+import re
 from datetime import date
 from typing import Union, Tuple
+from components.column_types import classify_columns
+
+# Column names that suggest a date stored as text
+DATE_NAME_PATTERN = re.compile(r'date|fecha', re.IGNORECASE)
 
 def render_date_filter(df):
     """
@@ -15,19 +21,24 @@ def render_date_filter(df):
         The selected date or date range
     """
     # Find date columns
-    date_columns = df.select_dtypes(include=['datetime64']).columns.tolist()
+    date_columns = classify_columns(df)['datetime']
     
     # If no date columns found, try to find columns that might be dates but were parsed as strings
     if not date_columns:
-        for col in df.columns:
-            if 'date' in col.lower() or 'fecha' in col.lower():
-                try:
-                    # Try to convert to datetime
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-                    if not df[col].isna().all():  # If not all values are NaN
-                        date_columns.append(col)
-                except:
-                    pass
+        candidates = [
+            col for col in df.columns
+            if DATE_NAME_PATTERN.search(str(col))
+            and (
+                pd.api.types.is_string_dtype(df[col])
+                or pd.api.types.is_object_dtype(df[col])
+                or isinstance(df[col].dtype, pd.CategoricalDtype)
+            )
+        ]
+        if candidates:
+            converted = _convert_date_columns(df[candidates])
+            for col, values in converted.items():
+                df[col] = values
+                date_columns.append(col)
     
     if not date_columns:
         st.warning("No se encontraron columnas de fecha en los datos. No es posible filtrar por fecha.")
@@ -63,11 +74,8 @@ def render_date_filter(df):
             max_value=max_date
         )
         
-        # Convert to datetime for filtering
-        filter_date = pd.to_datetime(selected_date)
-        
         # Filter the dataframe
-        filtered_df = df[df[date_column].dt.date == selected_date]
+        filtered_df = _filter_by_date(df, date_column, selected_date, selected_date)
         
         # Store in session state
         st.session_state.filtered_df = filtered_df
@@ -98,13 +106,8 @@ def render_date_filter(df):
             # En caso de error, usar la fecha más reciente
             start_date = end_date = max_date
         
-        # Handle single date selection when using date_input with a range
-        if start_date == end_date:
-            filtered_df = df[df[date_column].dt.date == start_date]
-        else:
-            # Filter the dataframe for the date range
-            filtered_df = df[(df[date_column].dt.date >= start_date) & 
-                            (df[date_column].dt.date <= end_date)]
+        # Filter the dataframe for the date range (a single day when both ends match)
+        filtered_df = _filter_by_date(df, date_column, start_date, end_date)
         
         # Store in session state
         st.session_state.filtered_df = filtered_df
@@ -112,10 +115,110 @@ def render_date_filter(df):
         
         return (start_date, end_date)
 
+@st.cache_data(show_spinner=False)
+def _convert_date_columns(df):
+    """
+    Converts the text columns that look like dates to datetime.
+    
+    Cached on the candidate columns, so the parsing only runs once per
+    upload. pd.to_datetime is called with cache=True, which parses each
+    distinct string once, as dates repeat a lot across rows.
+    
+    Args:
+        df: DataFrame with the candidate date columns
+        
+    Returns:
+        Dictionary of {column: converted datetime Series}, skipping the
+        columns where no value could be parsed
+    """
+    converted = {}
+    
+    for col in df.columns:
+        try:
+            values = pd.to_datetime(df[col], errors='coerce', cache=True)
+        except (TypeError, ValueError):
+            continue
+        
+        # Keep the column only if at least one value was parsed
+        if values.notna().any():
+            converted[col] = values
+    
+    return converted
+
+def _filter_by_date(df, date_column, start_date, end_date):
+    """
+    Selects the rows of a DataFrame within a date range.
+    
+    When the column is sorted, as it is for uploads, the range is found
+    with two binary searches and taken as a single slice, which shares
+    memory with the source frame (copy-on-write keeps it independent).
+    Other columns fall back to a boolean mask.
+    
+    Args:
+        df: The pandas DataFrame to filter
+        date_column: Name of the datetime column to filter on
+        start_date: First day of the range (inclusive)
+        end_date: Last day of the range (inclusive)
+        
+    Returns:
+        Filtered pandas DataFrame
+    """
+    dates = df[date_column]
+    
+    if dates.is_monotonic_increasing:
+        start, end = dates.searchsorted(_date_bounds(dates, start_date, end_date), side='left')
+        return df.iloc[start:end]
+    
+    return df.loc[_date_range_mask(dates, start_date, end_date)]
+
+def _date_bounds(dates, start_date, end_date):
+    """
+    Converts an inclusive date range into half-open Timestamp bounds.
+    
+    The bounds are localized to the time zone of the column (if any), so
+    tz-aware columns are compared on their own calendar days, as .dt.date did.
+    
+    Args:
+        dates: Datetime Series the bounds will be compared against
+        start_date: First day of the range (inclusive)
+        end_date: Last day of the range (inclusive)
+        
+    Returns:
+        List with the start Timestamp and the Timestamp of the day after end_date
+    """
+    tz = dates.dt.tz
+    start_ts = pd.Timestamp(start_date).tz_localize(tz)
+    end_ts = (pd.Timestamp(end_date) + pd.Timedelta(days=1)).tz_localize(tz)
+    
+    return [start_ts, end_ts]
+
+def _date_range_mask(dates, start_date, end_date):
+    """
+    Builds a boolean mask for the rows whose timestamp falls within a date range.
+    
+    Compares the datetime64 values against half-open Timestamp bounds
+    [start_date, end_date + 1 day), so no per-row datetime.date objects are
+    created as with .dt.date.
+    
+    Args:
+        dates: Datetime Series to filter
+        start_date: First day of the range (inclusive)
+        end_date: Last day of the range (inclusive)
+        
+    Returns:
+        Boolean Series aligned with dates
+    """
+    start_ts, end_ts = _date_bounds(dates, start_date, end_date)
+    
+    return (dates >= start_ts) & (dates < end_ts)
+
 def apply_filters(df, filters):
     """
     Applies additional filters to the DataFrame.
     
+    All the filters are combined into a single boolean mask, so the data is
+    only copied once when selecting the matching rows.
+    
     Args:
         df: The pandas DataFrame to filter
         filters: Dictionary of {column: value} pairs to filter on
@@ -123,13 +226,14 @@ def apply_filters(df, filters):
     Returns:
         Filtered pandas DataFrame
     """
-    filtered_df = df.copy()
+    mask = np.ones(len(df), dtype=bool)
     
     for column, value in filters.items():
-        if column in filtered_df.columns:
+        if column in df.columns:
             if isinstance(value, list):
-                filtered_df = filtered_df[filtered_df[column].isin(value)]
+                # Series.isin compares categorical columns on their codes
+                mask &= df[column].isin(value).to_numpy()
             else:
-                filtered_df = filtered_df[filtered_df[column] == value]
+                mask &= (df[column] == value).to_numpy()
     
-    return filtered_df
+    return df.loc[mask]
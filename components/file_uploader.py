@@ -1,7 +1,12 @@
 import streamlit as st
 import pandas as pd
 import os
-import tempfile
+import io
+import importlib.util
+from components.column_types import classify_columns
+
+# Prefer the Rust-based calamine reader, which is much faster than openpyxl
+EXCEL_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') else 'openpyxl'
 
 def render_uploader():
     """
@@ -18,6 +23,64 @@ def render_uploader():
     
     return uploaded_file
 
+@st.cache_data(show_spinner=False, max_entries=4)
+def _parse_excel(file_bytes):
+    """
+    Parses the 'Base de Datos' sheet from the raw bytes of an Excel file.
+    
+    Cached on the file contents, so Streamlit reruns reuse the parsed
+    DataFrame instead of reparsing the workbook. Each call returns its own
+    copy of the cached frame, so callers are free to mutate it. The rows
+    are sorted by the first date column.
+    
+    Args:
+        file_bytes: The raw contents of the uploaded file
+        
+    Returns:
+        pandas.DataFrame, or None if the workbook has no 'Base de Datos' sheet
+    """
+    # Parse straight from memory, without a temporary file
+    with pd.ExcelFile(io.BytesIO(file_bytes), engine=EXCEL_ENGINE) as xls:
+        # First check if the file has the required sheet
+        if 'Base de Datos' not in xls.sheet_names:
+            return None
+        
+        # Read the sheet into a DataFrame, preserving data types
+        df = pd.read_excel(xls, sheet_name='Base de Datos')
+    
+    df = _optimize_dtypes(df)
+    
+    # Keep the rows in date order, so the date filter can slice ranges with a binary search
+    date_columns = classify_columns(df)['datetime']
+    if date_columns:
+        df = df.sort_values(date_columns[0], kind='stable', ignore_index=True)
+    
+    return df
+
+def _optimize_dtypes(df):
+    """
+    Converts the DataFrame to compact dtypes right after loading it.
+    
+    Text columns where less than half of the values are distinct become
+    categoricals, which makes groupby, isin, value_counts and unique much
+    cheaper. Integer columns are downcast to the smallest integer type
+    that holds their values.
+    
+    Args:
+        df: The pandas DataFrame read from the Excel file
+        
+    Returns:
+        The same DataFrame with the converted columns
+    """
+    for col in df.select_dtypes(include=['object']).columns:
+        if df[col].nunique() < 0.5 * len(df):
+            df[col] = df[col].astype('category')
+    
+    for col in df.select_dtypes(include=['integer']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    
+    return df
+
 def process_excel_file(uploaded_file):
     """
     Processes the uploaded Excel file and returns a pandas DataFrame.
@@ -32,51 +95,32 @@ def process_excel_file(uploaded_file):
         return None
     
     try:
-        # Save the uploaded file to a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            tmp_file_path = tmp_file.name
+        # Read the upload once; the bytes are the cache key for the parse and
+        # are shared (not copied) by getvalue() and the BytesIO in _parse_excel
+        file_bytes = uploaded_file.getvalue()
         
-        # First check if the file has the required sheet
-        xls = pd.ExcelFile(tmp_file_path)
-        if 'Base de Datos' not in xls.sheet_names:
+        df = _parse_excel(file_bytes)
+        if df is None:
             st.error("El archivo Excel subido no contiene una hoja 'Base de Datos'.")
-            os.unlink(tmp_file_path)  # Delete the temporary file
             return None
         
-        # Read the sheet into a DataFrame, preserving data types
-        df = pd.read_excel(
-            tmp_file_path,
-            sheet_name='Base de Datos',
-            parse_dates=True,
-            engine='openpyxl'
-        )
-        
-        # Clean up the temporary file
-        os.unlink(tmp_file_path)
-        
         # Basic validation
         if df.empty:
             st.error("La hoja 'Base de Datos' está vacía.")
             return None
         
         # Check if there's at least one date column for filtering
-        date_columns = df.select_dtypes(include=['datetime64']).columns
-        if len(date_columns) == 0:
+        if not classify_columns(df)['datetime']:
             st.warning("No se detectaron columnas de fecha. Algunas funciones pueden no trabajar correctamente.")
         
         # Save the raw file for reference
         save_path = os.path.join('data', 'raw', uploaded_file.name)
         with open(save_path, 'wb') as f:
-            f.write(uploaded_file.getvalue())
+            f.write(file_bytes)
         
         st.success(f"Archivo '{uploaded_file.name}' procesado exitosamente.")
         return df
     
     except Exception as e:
         st.error(f"Error al procesar el archivo Excel: {str(e)}")
-        # Clean up the temporary file if it exists
-        tmp_file_path = locals().get('tmp_file_path')
-        if tmp_file_path and os.path.exists(tmp_file_path):
-            os.unlink(tmp_file_path)
         return None
@@ -6,13 +6,20 @@ import base64
 import tempfile
 import os
 import xlsxwriter
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
+from xml.sax.saxutils import escape
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from components.column_types import classify_columns
 
+@st.cache_data(ttl=300, show_spinner=False)
 def generate_metrics(df):
     """
     Generates key metrics from the DataFrame.
     
+    Results are cached for 5 minutes, keyed on the DataFrame contents.
+    
     Args:
         df: The pandas DataFrame containing the filtered data
         
@@ -26,18 +33,15 @@ def generate_metrics(df):
         return metrics
     
     # Identify numeric columns for analysis
-    numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-    
-    for col in numeric_cols:
-        metrics[col] = {
-            'mean': df[col].mean(),
-            'median': df[col].median(),
-            'min': df[col].min(),
-            'max': df[col].max(),
-            'sum': df[col].sum(),
-            'std': df[col].std(),
-            'count': df[col].count()
-        }
+    numeric_cols = classify_columns(df)['numeric']
+    
+    if numeric_cols:
+        # Compute every statistic for all the numeric columns in a single call
+        stats = df[numeric_cols].agg(['mean', 'median', 'min', 'max', 'sum', 'std', 'count'])
+        
+        for col in numeric_cols:
+            metrics[col] = stats[col].to_dict()
+            metrics[col]['count'] = int(metrics[col]['count'])
     
     # Add record count
     metrics['record_count'] = len(df)
@@ -62,11 +66,11 @@ def display_report(df, metrics):
     df_display = df.drop(columns=columnas_excluir, errors='ignore')
     metrics = {k: v for k, v in metrics.items() if k not in columnas_excluir}
     
-    # Convertir columnas de porcentaje a formato decimal y luego a porcentaje
-    for col in columnas_porcentaje:
-        if col in df_display.columns:
-            df_display[col] = df_display[col].astype(float) / 100
-            df_display[col] = df_display[col].map('{:.2%}'.format)
+    # Las columnas de porcentaje siguen siendo numéricas; el formato lo aplica st.dataframe en el navegador
+    formato_porcentaje = {
+        col: st.column_config.NumberColumn(format="%.2f%%")
+        for col in columnas_porcentaje if col in df_display.columns
+    }
     
     # Display key metrics in a two-column layout
     st.subheader("Métricas Clave")
@@ -88,7 +92,7 @@ def display_report(df, metrics):
         
         # Mostrar cada par de métricas
         for nombre, (col_prog, col_real) in pares_metricas.items():
-            if col_prog in metrics and col_real in metrics:
+            if metrics.keys() >= {col_prog, col_real}:
                 col1, col2 = st.columns(2)
                 
                 with col1:
@@ -112,7 +116,14 @@ def display_report(df, metrics):
     st.subheader("Informe Operacional")
     
     # Permitir selección de empresa
-    empresas = sorted(df_display['empresa'].unique()) if 'empresa' in df_display.columns else []
+    empresas = []
+    if 'empresa' in df_display.columns:
+        # Como categórica, las empresas presentes salen de los códigos y el filtro compara enteros
+        if not isinstance(df_display['empresa'].dtype, pd.CategoricalDtype):
+            df_display['empresa'] = df_display['empresa'].astype('category')
+        empresa_codes = df_display['empresa'].cat.codes.to_numpy()
+        empresa_categories = df_display['empresa'].cat.categories
+        empresas = sorted(empresa_categories[np.unique(empresa_codes[empresa_codes >= 0])])
     empresa_seleccionada = st.selectbox(
         "Seleccionar Empresa",
         options=empresas,
@@ -121,24 +132,27 @@ def display_report(df, metrics):
     
     if empresa_seleccionada:
         # Filtrar datos por empresa
-        df_empresa = df_display[df_display['empresa'] == empresa_seleccionada]
+        df_empresa = df_display[empresa_codes == empresa_categories.get_loc(empresa_seleccionada)]
+        
+        # Columnas programadas y reales, clasificadas una vez por esquema
+        column_types = classify_columns(df_empresa)
         
         # Crear dos columnas para Prog. y Real
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Programado")
-            cols_prog = [col for col in df_empresa.columns if 'prog' in col.lower()]
+            cols_prog = column_types['prog']
             if cols_prog:
-                st.dataframe(df_empresa[cols_prog])
+                st.dataframe(df_empresa[cols_prog], column_config=formato_porcentaje)
             else:
                 st.info("No hay datos programados disponibles")
         
         with col2:
             st.subheader("Real")
-            cols_real = [col for col in df_empresa.columns if 'real' in col.lower()]
+            cols_real = column_types['real']
             if cols_real:
-                st.dataframe(df_empresa[cols_real])
+                st.dataframe(df_empresa[cols_real], column_config=formato_porcentaje)
             else:
                 st.info("No hay datos reales disponibles")
     
@@ -167,10 +181,14 @@ def display_report(df, metrics):
                 mime="application/pdf"
             )
 
+@st.cache_data(ttl=300, max_entries=8, show_spinner="Generando archivo...")
 def export_to_excel(df, metrics):
     """
     Exports the report data to Excel format.
     
+    Cached on the data and metrics, so exporting the same report again
+    returns the file already built.
+    
     Args:
         df: The pandas DataFrame to export
         metrics: Dictionary of metrics
@@ -184,14 +202,9 @@ def export_to_excel(df, metrics):
         # Write data to a sheet
         df.to_excel(writer, sheet_name='Data', index=False)
         
-        # Create a sheet for metrics
-        metrics_df = pd.DataFrame()
-        
-        for metric_name, metric_values in metrics.items():
-            if metric_name != 'record_count':
-                # Convert metric dictionary to a row in the dataframe
-                metric_df = pd.DataFrame([metric_values], index=[metric_name])
-                metrics_df = pd.concat([metrics_df, metric_df])
+        # Create a sheet for metrics, one row per column in a single construction
+        column_metrics = {k: v for k, v in metrics.items() if k != 'record_count' and isinstance(v, dict)}
+        metrics_df = pd.DataFrame.from_dict(column_metrics, orient='index')
         
         if not metrics_df.empty:
             metrics_df.to_excel(writer, sheet_name='Metrics')
@@ -210,17 +223,21 @@ def export_to_excel(df, metrics):
         
         # Apply formatting to the data sheet
         worksheet = writer.sheets['Data']
-        for col_num, value in enumerate(df.columns.values):
-            worksheet.write(0, col_num, value, header_format)
-            worksheet.set_column(col_num, col_num, 18)
+        if len(df.columns):
+            worksheet.write_row(0, 0, df.columns.tolist(), header_format)
+            worksheet.set_column(0, len(df.columns) - 1, 18)
     
-    output.seek(0)
+    # getvalue() hands over the finished buffer as bytes without copying it
     return output.getvalue()
 
+@st.cache_data(ttl=300, max_entries=8, show_spinner="Generando archivo...")
 def export_to_pdf(df, metrics):
     """
     Exports the report data to PDF format.
     
+    Cached on the data and metrics, so exporting the same report again
+    returns the file already built.
+    
     Args:
         df: The pandas DataFrame to export
         metrics: Dictionary of metrics
@@ -229,50 +246,41 @@ def export_to_pdf(df, metrics):
         PDF file as bytes
     """
     output = io.BytesIO()
+    styles = getSampleStyleSheet()
+    story = []
     
-    with PdfPages(output) as pdf:
-        # First page: Metrics
-        plt.figure(figsize=(10, 8))
-        plt.title("Report Metrics", fontsize=16)
-        plt.axis('off')
-        
-        metrics_text = "Key Metrics:\n\n"
-        
-        for metric_name, metric_values in metrics.items():
-            if metric_name == 'record_count':
-                metrics_text += f"Total Records: {metric_values}\n"
-            else:
-                metrics_text += f"{metric_name}:\n"
-                for k, v in metric_values.items():
-                    metrics_text += f"  - {k}: {v:.2f}\n"
-                metrics_text += "\n"
-        
-        plt.text(0.1, 0.5, metrics_text, fontsize=12, verticalalignment='center')
-        pdf.savefig()
-        plt.close()
-        
-        # Second page: Data table
-        fig, ax = plt.subplots(figsize=(12, 6))
-        ax.axis('tight')
-        ax.axis('off')
-        
-        # Only include the first 20 rows to keep PDF manageable
-        display_df = df.head(20)
-        
-        table = ax.table(
-            cellText=display_df.values,
-            colLabels=display_df.columns,
-            loc='center',
-            cellLoc='center'
-        )
-        
-        table.auto_set_font_size(False)
-        table.set_fontsize(8)
-        table.scale(1, 1.5)
-        
-        plt.title(f"Data Table (First {len(display_df)} rows)", fontsize=16)
-        pdf.savefig()
-        plt.close()
+    # First page: Metrics
+    story.append(Paragraph("Report Metrics", styles['Title']))
+    story.append(Paragraph("Key Metrics:", styles['Heading2']))
+    
+    for metric_name, metric_values in metrics.items():
+        if metric_name == 'record_count':
+            story.append(Paragraph(f"Total Records: {metric_values}", styles['Normal']))
+        else:
+            lines = [f"<b>{escape(str(metric_name))}:</b>"]
+            lines += [f"&nbsp;&nbsp;- {k}: {v:.2f}" for k, v in metric_values.items()]
+            story.append(Paragraph("<br/>".join(lines), styles['Normal']))
+            story.append(Spacer(1, 6))
+    
+    story.append(PageBreak())
+    
+    # Second page: Data table
+    # Only include the first 20 rows to keep PDF manageable
+    display_df = df.head(20)
+    
+    story.append(Paragraph(f"Data Table (First {len(display_df)} rows)", styles['Title']))
+    table = Table(
+        [display_df.columns.astype(str).tolist()] + display_df.astype(str).values.tolist(),
+        repeatRows=1
+    )
+    table.setStyle(TableStyle([
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D7E4BC')),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey)
+    ]))
+    story.append(table)
+    
+    SimpleDocTemplate(output, pagesize=landscape(letter)).build(story)
     
-    output.seek(0)
     return output.getvalue()
\ No newline at end of file
@@ -2,10 +2,16 @@ import streamlit as st
 import pandas as pd
 import os
 import json
+import logging
 import pickle
 from datetime import datetime
 import database as db
 
+logger = logging.getLogger(__name__)
+
+# Archivos de datos que puede contener un informe respaldado en disco
+DATA_FILES = {'data.parquet', 'data.pkl', 'data.csv'}
+
 def save_report(df, date, metrics=None, analysis=None):
     """
     Saves the report data to the database.
@@ -22,12 +28,10 @@ def save_report(df, date, metrics=None, analysis=None):
     try:
         # Preparar métricas serializables
         if metrics:
-            serializable_metrics = {}
-            for key, value in metrics.items():
-                if isinstance(value, dict):
-                    serializable_metrics[key] = {k: float(v) if isinstance(v, (int, float, complex)) else v for k, v in value.items()}
-                else:
-                    serializable_metrics[key] = float(value) if isinstance(value, (int, float, complex)) else value
+            serializable_metrics = {
+                key: {k: _coerce_metric(v) for k, v in value.items()} if isinstance(value, dict) else _coerce_metric(value)
+                for key, value in metrics.items()
+            }
         else:
             serializable_metrics = None
             
@@ -45,15 +49,28 @@ def save_report(df, date, metrics=None, analysis=None):
             report_dir = os.path.join('data', 'processed', date.strftime('%Y-%m-%d'))
             os.makedirs(report_dir, exist_ok=True)
             
-            # Save data to CSV
-            df.to_csv(os.path.join(report_dir, 'data.csv'), index=False)
+            # Save a single compressed Parquet file, which keeps the dtypes
+            try:
+                data_file = 'data.parquet'
+                df.to_parquet(os.path.join(report_dir, data_file), engine='pyarrow', compression='zstd', index=False)
+            except (ImportError, ValueError, TypeError) as parquet_e:
+                # Columns with mixed types can't be stored in Parquet; fall back to pickle
+                logger.warning("No se pudo guardar en Parquet, se usa pickle: %s", parquet_e)
+                data_file = 'data.pkl'
+                with open(os.path.join(report_dir, data_file), 'wb') as f:
+                    pickle.dump(df, f)
             
-            # Save a pickle file of the DataFrame for easier reloading
-            with open(os.path.join(report_dir, 'data.pkl'), 'wb') as f:
-                pickle.dump(df, f)
-        except Exception as e:
+            # Remove the data files of earlier saves, which load_report could prefer over this one
+            for name in DATA_FILES - {data_file}:
+                path = os.path.join(report_dir, name)
+                if os.path.exists(path):
+                    os.remove(path)
+        except Exception:
             # Si falla el respaldo en archivos, solo lo registramos pero continuamos
-            print(f"Advertencia: respaldo en sistema de archivos falló: {str(e)}")
+            logger.exception("El respaldo en sistema de archivos falló")
+        
+        # El listado de fechas cacheado ya no está al día
+        clear_saved_report_dates()
             
         return success
     
@@ -61,6 +78,24 @@ def save_report(df, date, metrics=None, analysis=None):
         st.error(f"Error al guardar el informe: {str(e)}")
         return False
 
+def _coerce_metric(value):
+    """
+    Converts a metric value to a float for JSON serialization.
+    
+    Args:
+        value: The metric value
+        
+    Returns:
+        The value as a float, or unchanged if it is text or not numeric
+    """
+    if isinstance(value, str):
+        return value
+    
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
 def load_report(date):
     """
     Loads a saved report from the database.
@@ -86,9 +121,13 @@ def load_report(date):
             st.error(f"No se encontró ningún informe para {date.strftime('%Y-%m-%d')}.")
             return None
         
-        # Cargar datos desde el archivo pickle
+        # Cargar datos desde el archivo Parquet
+        parquet_path = os.path.join(report_dir, 'data.parquet')
         data_path = os.path.join(report_dir, 'data.pkl')
-        if os.path.exists(data_path):
+        if os.path.exists(parquet_path):
+            df = pd.read_parquet(parquet_path, engine='pyarrow')
+        elif os.path.exists(data_path):
+            # Respaldos antiguos (o sin soporte Parquet) en pickle
             with open(data_path, 'rb') as f:
                 df = pickle.load(f)
         else:
@@ -114,8 +153,8 @@ def load_report(date):
                 # Guardar en la base de datos para futuras consultas
                 try:
                     db.save_report_to_db(df, date, None, metrics, analysis)
-                except Exception as db_e:
-                    print(f"No se pudo sincronizar con la base de datos: {str(db_e)}")
+                except Exception:
+                    logger.exception("No se pudo sincronizar con la base de datos")
                 
                 return {
                     'data': df,
@@ -123,8 +162,8 @@ def load_report(date):
                     'analysis': analysis,
                     'metadata': metadata
                 }
-            except Exception as json_e:
-                print(f"Error al cargar metadata: {str(json_e)}")
+            except Exception:
+                logger.exception("Error al cargar metadata")
                 # Continuar sin metadata
         else:
             # Devolver solo los datos si no se encuentra metadata
@@ -154,33 +193,55 @@ def get_saved_report_dates():
             return db_dates
             
         # Si no hay fechas en la base de datos, buscar en el sistema de archivos (compatibilidad hacia atrás)
-        processed_dir = os.path.join('data', 'processed')
-        
-        # Verificar si el directorio existe
-        if not os.path.exists(processed_dir):
-            return []
-        
-        # Obtener lista de subdirectorios (fechas)
-        dates = []
-        for dir_name in os.listdir(processed_dir):
+        return _scan_fs_dates()
+    
+    except Exception as e:
+        st.error(f"Error al obtener las fechas de informes guardados: {str(e)}")
+        return []
+
+def clear_saved_report_dates():
+    """
+    Clears the cached filesystem report dates, so new or deleted reports show up right away.
+    
+    The database dates are cached by the database module itself, which
+    invalidates them on every save and delete.
+    """
+    _scan_fs_dates.clear()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _scan_fs_dates():
+    """
+    Gets the report dates backed up in data/processed, cached for 60 seconds.
+    
+    Returns:
+        List of datetime.date objects, most recent first
+    """
+    processed_dir = os.path.join('data', 'processed')
+    
+    # Verificar si el directorio existe
+    if not os.path.exists(processed_dir):
+        return []
+    
+    # Obtener lista de subdirectorios (fechas); scandir ya indica si cada entrada es un directorio
+    dates = []
+    with os.scandir(processed_dir) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            
             try:
                 # Intentar analizar el nombre del directorio como una fecha
-                date = datetime.strptime(dir_name, '%Y-%m-%d').date()
-                
-                # Verificar si es un informe válido buscando archivos necesarios
-                report_dir = os.path.join(processed_dir, dir_name)
-                if os.path.exists(os.path.join(report_dir, 'data.csv')) or \
-                   os.path.exists(os.path.join(report_dir, 'data.pkl')):
-                    dates.append(date)
+                date = datetime.strptime(entry.name, '%Y-%m-%d').date()
             except ValueError:
                 # Omitir directorios que no coinciden con el formato de fecha
                 continue
-        
-        # Ordenar fechas en orden descendente (más recientes primero)
-        dates.sort(reverse=True)
-        
-        return dates
+            
+            # Verificar si es un informe válido buscando archivos de datos en un solo listado
+            with os.scandir(entry.path) as report_entries:
+                if any(report_entry.name in DATA_FILES for report_entry in report_entries):
+                    dates.append(date)
     
-    except Exception as e:
-        st.error(f"Error al obtener las fechas de informes guardados: {str(e)}")
-        return []
+    # Ordenar fechas en orden descendente (más recientes primero)
+    dates.sort(reverse=True)
+    
+    return dates
@@ -1,54 +1,300 @@
 import os
 import json
+import math
+import logging
+import re
+import importlib.util
 import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, MetaData
+import streamlit as st
+from sqlalchemy import create_engine, Column, Integer, String, Date, DateTime, LargeBinary, JSON, select, delete, func, inspect, text, bindparam
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.orm import sessionmaker
-from datetime import datetime
+from sqlalchemy.orm import sessionmaker, scoped_session, deferred, undefer
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.dialects.postgresql import JSONB
+import io
 import pickle
+import pyarrow as pa
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import base64
 
+# Primeros bytes de cada formato de serialización del DataFrame
+ARROW_STREAM_MAGIC = b'\xff\xff\xff\xff'
+PARQUET_MAGIC = b'PAR1'
+PICKLE_MAGIC = b'\x80'
+
+# Pool para serializar en paralelo los DataFrames de un guardado en lote; Arrow libera el GIL
+_io_pool = ThreadPoolExecutor(max_workers=4)
+
+logger = logging.getLogger(__name__)
+
+# Tablas Arrow de los últimos informes guardados en este proceso: fecha -> (created_at, tabla)
+TABLE_CACHE_SIZE = 8
+_table_cache = OrderedDict()
+_table_cache_lock = threading.Lock()
+
+# Compresión zstd de los buffers Arrow (si la build de pyarrow la incluye)
+IPC_WRITE_OPTIONS = pa.ipc.IpcWriteOptions(
+    compression=pa.Codec('zstd', compression_level=3) if pa.Codec.is_available('zstd') else None
+)
+
 # Obtener la URL de conexión a la base de datos desde variables de entorno
 DATABASE_URL = os.environ.get('DATABASE_URL', '')
 
 # Verificar que tenemos una URL válida para la base de datos
 if not DATABASE_URL:
-    print("Advertencia: No se encontró la URL de la base de datos. Usando SQLite en memoria.")
+    logger.warning("No se encontró la URL de la base de datos. Usando SQLite en memoria.")
     DATABASE_URL = "sqlite:///:memory:"
 
+# Preferir psycopg 3 (más rápido con SQLAlchemy 2.0) cuando está instalado y la URL no fija un driver
+POSTGRES_DRIVER = 'psycopg' if importlib.util.find_spec('psycopg') else 'psycopg2'
+DATABASE_URL = re.sub(r'^postgres(ql)?://', f'postgresql+{POSTGRES_DRIVER}://', DATABASE_URL)
+
+@st.cache_resource
+def get_engine():
+    """
+    Crea el motor de base de datos una sola vez por proceso.
+    
+    El motor mantiene un pool de conexiones que se reutiliza entre sesiones
+    y reejecuciones de Streamlit, en lugar de abrir una conexión nueva en
+    cada interacción.
+    """
+    if DATABASE_URL == 'sqlite:///:memory:':
+        # Una única conexión compartida: cada conexión nueva tendría su propia base en memoria
+        return create_engine(
+            DATABASE_URL,
+            poolclass=StaticPool,
+            connect_args={'check_same_thread': False}
+        )
+    
+    if DATABASE_URL.startswith('sqlite'):
+        # SQLite no admite los parámetros de tamaño del pool
+        return create_engine(DATABASE_URL)
+    
+    return create_engine(
+        DATABASE_URL,
+        pool_size=10,
+        max_overflow=20,
+        pool_timeout=30,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+        # Reutilizar la conexión usada más recientemente, que ya está caliente
+        pool_use_lifo=True
+    )
+
 # Crear el motor de base de datos
-engine = create_engine(DATABASE_URL)
+engine = get_engine()
 Base = declarative_base()
 
+# Tipo JSON de la base de datos; None se guarda como NULL de SQL
+JSON_TYPE = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), 'postgresql')
+
 # Definir el modelo de datos para los informes
 class Report(Base):
     __tablename__ = 'reports'
 
     id = Column(Integer, primary_key=True)
-    date = Column(DateTime, nullable=False)
+    date = Column(Date, nullable=False, unique=True, index=True)
     filename = Column(String(255), nullable=True)
-    created_at = Column(DateTime, default=datetime.now)
-    dataframe = Column(Text)  # DataFrame serializado
-    metrics = Column(Text)  # Métricas serializadas como JSON
-    analysis = Column(Text)  # Análisis serializado como JSON
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    dataframe = deferred(Column(LargeBinary))  # DataFrame serializado (Arrow IPC), solo se carga si se pide
+    metrics = Column(JSON_TYPE)  # Métricas como JSON nativo (JSONB en PostgreSQL)
+    analysis = Column(JSON_TYPE)  # Análisis como JSON nativo (JSONB en PostgreSQL)
+
+# Sentencias por fecha construidas una sola vez; la fecha se pasa como parámetro 'report_date'
+_BY_DATE = select(Report).where(Report.date == bindparam('report_date')).limit(1)
+_WITH_DATA_BY_DATE = _BY_DATE.options(undefer(Report.dataframe))
+_ID_BY_DATE = select(Report.id).where(Report.date == bindparam('report_date')).limit(1)
+_DELETE_BY_DATE = delete(Report).where(Report.date == bindparam('report_date'))
 
 # Crear las tablas
 Base.metadata.create_all(engine)
 
-# Crear una sesión para interactuar con la base de datos
-Session = sessionmaker(bind=engine)
+# Crear una sesión por hilo para interactuar con la base de datos; los objetos
+# siguen siendo legibles después del commit
+Session = scoped_session(sessionmaker(bind=engine, expire_on_commit=False))
 
 def serialize_dataframe(df):
     """
-    Serializa un DataFrame de pandas a un string base64 para guardarlo en la base de datos.
+    Serializa un DataFrame de pandas en formato Arrow IPC para guardarlo en la base de datos.
+    
+    Arrow guarda cada columna como un bloque de memoria contiguo, que se escribe
+    y se vuelve a leer sin reconstruir objeto por objeto como pickle. El índice
+    y los tipos de pandas (categóricas incluidas) se conservan en el esquema.
+    Los buffers se comprimen con zstd dentro del propio stream, así que la
+    lectura los descomprime sin pasos adicionales. Los DataFrames que Arrow no
+    puede representar (por ejemplo, columnas con tipos mezclados) se guardan
+    con pickle.
     """
-    return base64.b64encode(pickle.dumps(df)).decode('utf-8')
+    return _serialize(df)[0]
+
+def _serialize(df):
+    """
+    Serializa un DataFrame como serialize_dataframe, devolviendo también la tabla Arrow.
+    
+    Returns:
+        Tupla (bytes serializados, tabla Arrow o None si se usó pickle)
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+    except (ValueError, TypeError) as e:
+        logger.warning("No se pudo serializar en Arrow, se usa pickle: %s", e)
+        return pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL), None
+    
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema, options=IPC_WRITE_OPTIONS) as writer:
+        writer.write_table(table)
+    
+    return sink.getvalue(), table
 
 def deserialize_dataframe(serialized_df):
     """
-    Deserializa un string base64 a un DataFrame de pandas.
+    Deserializa un DataFrame guardado en la base de datos.
+    
+    Reconoce el formato por sus primeros bytes: Arrow IPC, Parquet, pickle, o
+    el formato antiguo de pickle codificado en base64 (como texto o como bytes
+    tras la migración).
     """
-    return pickle.loads(base64.b64decode(serialized_df.encode('utf-8')))
+    if isinstance(serialized_df, str):
+        serialized_df = serialized_df.encode('utf-8')
+    
+    if serialized_df[:4] == ARROW_STREAM_MAGIC:
+        # Lectura sin copia de los buffers; to_pandas crea los arrays (modificables) de una vez
+        return pa.ipc.open_stream(pa.py_buffer(serialized_df)).read_all().to_pandas()
+    
+    if serialized_df[:4] == PARQUET_MAGIC:
+        return pd.read_parquet(io.BytesIO(serialized_df), engine='pyarrow')
+    
+    if serialized_df[:1] == PICKLE_MAGIC:
+        return pickle.loads(serialized_df)
+    
+    # Informes guardados antes del cambio a binario
+    return pickle.loads(base64.b64decode(serialized_df))
+
+def _migrate_schema():
+    """
+    Actualiza las tablas creadas por versiones anteriores de la aplicación.
+    
+    - En PostgreSQL, migra la columna dataframe de texto (pickle en base64) a
+      binario. Los informes existentes conservan su contenido como bytes y se
+      siguen leyendo con deserialize_dataframe. En SQLite no hace falta, ya
+      que la columna admite cualquier tipo de valor.
+    - Convierte la columna date de fecha y hora a solo fecha: en PostgreSQL
+      cambiando su tipo, y en SQLite recortando los valores guardados como texto.
+    - En PostgreSQL, convierte las columnas metrics y analysis de texto a JSONB.
+    - Crea el índice único sobre la fecha que necesita el upsert. Si hay
+      fechas repetidas no borra nada: lo avisa en el log y el índice queda
+      pendiente de deduplicate_reports().
+    
+    Returns:
+        Boolean indicando si la tabla tiene el índice único sobre la fecha
+    """
+    try:
+        with engine.begin() as connection:
+            inspector = inspect(connection)
+            columns = {column['name']: column['type'] for column in inspector.get_columns('reports')}
+            
+            if engine.dialect.name == 'postgresql':
+                if isinstance(columns.get('dataframe'), String):
+                    connection.execute(text(
+                        "ALTER TABLE reports ALTER COLUMN dataframe TYPE BYTEA "
+                        "USING convert_to(dataframe, 'UTF8')"
+                    ))
+                if isinstance(columns.get('date'), DateTime):
+                    connection.execute(text(
+                        "ALTER TABLE reports ALTER COLUMN date TYPE DATE USING date::date"
+                    ))
+                for column in ('metrics', 'analysis'):
+                    if isinstance(columns.get(column), String):
+                        # json.dumps escribía NaN/Infinity, que JSONB no admite: se reescriben
+                        # como null con el parser de JSON, sin tocar los textos que los mencionen
+                        rows = connection.execute(text(
+                            f"SELECT id, {column} FROM reports WHERE {column} ~ '(NaN|Infinity)'"
+                        )).all()
+                        if rows:
+                            connection.execute(
+                                text(f"UPDATE reports SET {column} = :value WHERE id = :id"),
+                                [
+                                    {'id': row_id, 'value': json.dumps(json.loads(value, parse_constant=lambda _: None))}
+                                    for row_id, value in rows
+                                ]
+                            )
+                        connection.execute(text(
+                            f"ALTER TABLE reports ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb"
+                        ))
+            elif engine.dialect.name == 'sqlite':
+                connection.execute(text(
+                    "UPDATE reports SET date = substr(date, 1, 10) WHERE length(date) > 10"
+                ))
+            
+            if 'ix_reports_date' in {index['name'] for index in inspector.get_indexes('reports')}:
+                return True
+            
+            duplicates = connection.execute(text(
+                "SELECT COUNT(*) - COUNT(DISTINCT date) FROM reports"
+            )).scalar_one()
+            if duplicates:
+                logger.warning(
+                    "Hay %d informes con fecha repetida; no se crea el índice único sobre la fecha "
+                    "hasta ejecutar database.deduplicate_reports()", duplicates
+                )
+                return False
+            
+            connection.execute(text("CREATE UNIQUE INDEX ix_reports_date ON reports (date)"))
+            return True
+    except Exception:
+        logger.exception("Error al migrar el esquema de la base de datos")
+        return False
+
+def deduplicate_reports():
+    """
+    Elimina los informes con fecha repetida y crea el índice único sobre la fecha.
+    
+    Paso manual para tablas de versiones anteriores que tienen fechas
+    repetidas, por ejemplo:
+    python -c "import database; database.deduplicate_reports()"
+    Conserva el informe más reciente (el de mayor id) de cada fecha.
+    
+    Returns:
+        Número de informes eliminados
+    """
+    global dialect_insert
+    
+    with engine.begin() as connection:
+        result = connection.execute(text(
+            "DELETE FROM reports WHERE id NOT IN (SELECT MAX(id) FROM reports GROUP BY date)"
+        ))
+        if 'ix_reports_date' not in {index['name'] for index in inspect(connection).get_indexes('reports')}:
+            connection.execute(text("CREATE UNIQUE INDEX ix_reports_date ON reports (date)"))
+    
+    logger.warning("Se eliminaron %d informes con fecha repetida", result.rowcount)
+    
+    # Con el índice creado ya se puede usar el upsert; lo guardado en caché puede haber cambiado
+    dialect_insert = _dialect_insert()
+    _query_saved_report_dates.clear()
+    with _table_cache_lock:
+        _table_cache.clear()
+    
+    return result.rowcount
+
+def _dialect_insert():
+    """
+    Devuelve el INSERT con ON CONFLICT del motor en uso, si lo admite.
+    
+    Returns:
+        La función insert del dialecto, o None
+    """
+    if engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if engine.dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+# Sin el índice único sobre la fecha no hay ON CONFLICT posible; se usa la ruta de consulta y UPDATE
+dialect_insert = _dialect_insert() if _migrate_schema() else None
 
 def save_report_to_db(df, date, filename=None, metrics=None, analysis=None):
     """
@@ -64,52 +310,135 @@ def save_report_to_db(df, date, filename=None, metrics=None, analysis=None):
     Returns:
         Boolean indicando éxito o fracaso
     """
-    session = None
     try:
-        session = Session()
-        
-        # Serializar el DataFrame
-        serialized_df = serialize_dataframe(df)
-        
-        # Serializar métricas y análisis
-        serialized_metrics = json.dumps(metrics) if metrics else None
-        serialized_analysis = json.dumps(analysis) if analysis else None
-        
-        # Verificar si ya existe un informe para esta fecha
-        existing_report = session.query(Report).filter(Report.date == date).first()
-        
-        if existing_report:
-            # Actualizar el informe existente
-            existing_report.filename = filename
-            existing_report.dataframe = serialized_df
-            existing_report.metrics = serialized_metrics
-            existing_report.analysis = serialized_analysis
-            existing_report.created_at = datetime.now()
-        else:
-            # Crear un nuevo registro de informe
-            new_report = Report(
-                date=date,
-                filename=filename,
-                dataframe=serialized_df,
-                metrics=serialized_metrics,
-                analysis=serialized_analysis
-            )
-            # Agregar el nuevo informe
-            session.add(new_report)
-        
-        # Guardar los cambios
-        session.commit()
+        # Serializar el DataFrame, conservando su tabla Arrow para la caché
+        serialized_df, table = _serialize(df)
+        values = _report_values(date, filename, serialized_df, metrics, analysis)
+        # Hora del servidor de base de datos; explícita porque las tablas antiguas no tienen server_default
+        values['created_at'] = func.now()
+        
+        # La transacción se confirma al salir del bloque, o se revierte si hay un error
+        saved = None
+        with Session() as session, session.begin():
+            if dialect_insert is not None:
+                # Insertar o, si ya existe un informe para esta fecha, reemplazarlo en una sola sentencia
+                stmt = dialect_insert(Report).values(**values)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Report.date],
+                    set_={key: stmt.excluded[key] for key in values if key != 'date'}
+                )
+                if engine.dialect.insert_returning:
+                    # Recuperar la clave con la que el informe queda en la caché de tablas
+                    saved = session.execute(stmt.returning(Report.date, Report.created_at)).one()
+                else:
+                    session.execute(stmt)
+            else:
+                # Otros motores: verificar si ya existe un informe para esta fecha (solo el id)
+                existing_id = session.execute(_ID_BY_DATE, {'report_date': date}).scalar_one_or_none()
+                
+                if existing_id is not None:
+                    # Actualizar el informe existente con un único UPDATE
+                    session.query(Report).filter(Report.id == existing_id).update(
+                        {getattr(Report, key): value for key, value in values.items()},
+                        synchronize_session=False
+                    )
+                else:
+                    # Crear un nuevo registro de informe
+                    session.add(Report(**values))
+        
+        # El listado de fechas en caché ya no está al día
+        _query_saved_report_dates.clear()
+        
+        # Conservar la tabla Arrow para que la siguiente carga no vuelva a leer el BLOB
+        _evict_cached_table(date)
+        if saved is not None and table is not None:
+            _cache_table(saved.date, saved.created_at, table)
+        
+        return True
+    
+    except Exception:
+        logger.exception("Error al guardar el informe en la base de datos")
+        return False
+
+def save_reports_bulk(records):
+    """
+    Guarda varios informes en la base de datos en una sola transacción.
+    
+    En PostgreSQL y SQLite se envían todos con una única sentencia INSERT
+    (ON CONFLICT DO UPDATE) ejecutada en lote, en lugar de una ida y vuelta
+    por informe. Si hay varios registros para la misma fecha, gana el último.
+    
+    Args:
+        records: Lista de diccionarios con las claves 'df' y 'date', y
+            opcionalmente 'filename', 'metrics' y 'analysis'
+        
+    Returns:
+        Boolean indicando éxito o fracaso
+    """
+    if not records:
+        return True
+    
+    if dialect_insert is None:
+        # Otros motores: sin upsert nativo, se guarda informe por informe
+        return all([
+            save_report_to_db(record['df'], record['date'], record.get('filename'),
+                              record.get('metrics'), record.get('analysis'))
+            for record in records
+        ])
+    
+    try:
+        # Serializar todo en paralelo antes de abrir la transacción; una fila por fecha
+        payloads = _io_pool.map(serialize_dataframe, [record['df'] for record in records])
+        rows = {
+            record['date']: _report_values(record['date'], record.get('filename'), payload,
+                                           record.get('metrics'), record.get('analysis'))
+            for record, payload in zip(records, payloads)
+        }
+        
+        stmt = dialect_insert(Report).values(created_at=func.now())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Report.date],
+            set_={
+                **{key: stmt.excluded[key] for key in ('filename', 'dataframe', 'metrics', 'analysis')},
+                'created_at': func.now()
+            }
+        )
+        
+        with Session() as session, session.begin():
+            session.execute(stmt, list(rows.values()))
+        
+        # El listado de fechas en caché ya no está al día
+        _query_saved_report_dates.clear()
+        for date in rows:
+            _evict_cached_table(date)
+        
         return True
     
-    except Exception as e:
-        print(f"Error al guardar el informe en la base de datos: {str(e)}")
-        if session:
-            session.rollback()
+    except Exception:
+        logger.exception("Error al guardar los informes en la base de datos")
         return False
+
+def _report_values(date, filename, serialized_df, metrics, analysis):
+    """
+    Prepara los valores de una fila de la tabla de informes.
     
-    finally:
-        if session:
-            session.close()
+    Args:
+        date: Fecha del informe (objeto datetime.date)
+        filename: Nombre del archivo original
+        serialized_df: DataFrame serializado con serialize_dataframe
+        metrics: Diccionario de métricas
+        analysis: Diccionario de resultados de análisis
+        
+    Returns:
+        Diccionario con el DataFrame serializado y el JSON ya saneado
+    """
+    return {
+        'date': date,
+        'filename': filename,
+        'dataframe': serialized_df,
+        'metrics': _json_safe(metrics) if metrics else None,
+        'analysis': _json_safe(analysis) if analysis else None
+    }
 
 def load_report_from_db(date):
     """
@@ -121,84 +450,206 @@ def load_report_from_db(date):
     Returns:
         Diccionario con los datos del informe o None si falló
     """
-    session = None
     try:
-        session = Session()
+        cached = _cached_table(date)
         
-        # Buscar el informe por fecha
-        report = session.query(Report).filter(Report.date == date).first()
-        
-        if not report:
-            return None
+        with Session() as session:
+            if cached is None:
+                # Buscar el informe por fecha, incluyendo el DataFrame serializado
+                report = session.execute(_WITH_DATA_BY_DATE, {'report_date': date}).scalar_one_or_none()
+            else:
+                # Hay una tabla en memoria: basta con los metadatos para validarla por created_at
+                report = session.execute(_BY_DATE, {'report_date': date}).scalar_one_or_none()
+            
+            if not report:
+                return None
+            
+            if cached is not None and cached[0] == report.created_at:
+                return {'data': cached[1].to_pandas(), **_report_metadata(report)}
+            
+            # Sin tabla en memoria ya está cargado; si quedó desactualizada, se carga la columna diferida
+            serialized_df = report.dataframe
         
         # Deserializar el DataFrame
-        df = deserialize_dataframe(report.dataframe)
+        df = deserialize_dataframe(serialized_df)
         
-        # Deserializar métricas y análisis
-        metrics_str = str(report.metrics) if report.metrics else '{}'
-        analysis_str = str(report.analysis) if report.analysis else '{}'
+        # Devolver los datos en formato de diccionario
+        return {'data': df, **_report_metadata(report)}
+    
+    except Exception:
+        logger.exception("Error al cargar el informe desde la base de datos")
+        return None
+
+def _cache_table(date, created_at, table):
+    """
+    Guarda la tabla Arrow de un informe en la caché, descartando la menos usada.
+    
+    Args:
+        date: Fecha del informe (objeto datetime.date)
+        created_at: Momento del guardado, para validar la tabla al cargarla
+        table: Tabla Arrow con los datos del informe
+    """
+    with _table_cache_lock:
+        _table_cache[date] = (created_at, table)
+        _table_cache.move_to_end(date)
+        while len(_table_cache) > TABLE_CACHE_SIZE:
+            _table_cache.popitem(last=False)
+
+def _cached_table(date):
+    """
+    Busca la tabla Arrow de un informe en la caché.
+    
+    Args:
+        date: Fecha del informe (objeto datetime.date)
         
-        try:
-            metrics = json.loads(metrics_str)
-        except:
-            metrics = {}
-            
-        try:
-            analysis = json.loads(analysis_str)
-        except:
-            analysis = {}
-        
-        # Preparar los metadatos
-        metadata = {
-            'date': report.date.strftime('%Y-%m-%d'),
-            'created_at': report.created_at.strftime('%Y-%m-%d %H:%M:%S')
-        }
+    Returns:
+        Tupla (created_at, tabla Arrow), o None si no está en la caché
+    """
+    with _table_cache_lock:
+        cached = _table_cache.get(date)
+        if cached is not None:
+            _table_cache.move_to_end(date)
+        return cached
+
+def _evict_cached_table(date):
+    """
+    Quita de la caché la tabla de una fecha, que ya no corresponde a lo guardado.
+    
+    Args:
+        date: Fecha del informe (objeto datetime.date)
+    """
+    with _table_cache_lock:
+        _table_cache.pop(date, None)
+
+def load_report_metadata(date):
+    """
+    Carga las métricas, el análisis y los metadatos de un informe, sin su DataFrame.
+    
+    Args:
+        date: Fecha del informe (objeto datetime.date)
         
-        if report.filename:
-            metadata['filename'] = report.filename
+    Returns:
+        Diccionario con metrics, analysis y metadata, o None si falló
+    """
+    try:
+        with Session() as session:
+            # La columna dataframe es diferida, así que no se transfiere
+            report = session.execute(_BY_DATE, {'report_date': date}).scalar_one_or_none()
         
-        # Devolver los datos en formato de diccionario
-        return {
-            'data': df,
-            'metrics': metrics,
-            'analysis': analysis,
-            'metadata': metadata
-        }
+        if not report:
+            return None
+        
+        return _report_metadata(report)
     
-    except Exception as e:
-        print(f"Error al cargar el informe desde la base de datos: {str(e)}")
+    except Exception:
+        logger.exception("Error al cargar los metadatos del informe desde la base de datos")
         return None
+
+def _json_safe(value):
+    """
+    Reemplaza los NaN e infinitos por None, ya que JSON no los admite.
     
-    finally:
-        if session:
-            session.close()
+    Args:
+        value: Diccionario, lista o valor de las métricas o el análisis
+        
+    Returns:
+        El mismo valor con los números no finitos convertidos en None
+    """
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+def _report_metadata(report):
+    """
+    Obtiene las métricas, el análisis y los metadatos de un informe.
+    
+    Args:
+        report: Objeto Report cargado de la base de datos
+        
+    Returns:
+        Diccionario con metrics, analysis y metadata
+    """
+    # Las columnas JSON ya llegan como diccionarios
+    metrics = report.metrics or {}
+    analysis = report.analysis or {}
+    
+    # Preparar los metadatos
+    metadata = {
+        'date': report.date.strftime('%Y-%m-%d'),
+        'created_at': report.created_at.strftime('%Y-%m-%d %H:%M:%S')
+    }
+    
+    if report.filename:
+        metadata['filename'] = report.filename
+    
+    return {
+        'metrics': metrics,
+        'analysis': analysis,
+        'metadata': metadata
+    }
 
 def get_saved_report_dates_from_db():
     """
     Obtiene una lista de fechas para las que hay informes guardados.
     
+    El resultado se guarda en caché durante 30 segundos y se invalida al
+    guardar o eliminar un informe.
+    
     Returns:
         Lista de objetos datetime.date
     """
-    session = None
     try:
-        session = Session()
-        
-        # Consultar todas las fechas de informes
-        reports = session.query(Report.date).order_by(Report.date.desc()).all()
-        
-        # Extraer las fechas
-        dates = [report.date.date() for report in reports]
-        
-        return dates
+        return _query_saved_report_dates()
     
-    except Exception as e:
-        print(f"Error al obtener las fechas de informes guardados: {str(e)}")
+    except Exception:
+        logger.exception("Error al obtener las fechas de informes guardados")
         return []
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _query_saved_report_dates():
+    """
+    Consulta las fechas de los informes guardados, de la más reciente a la más antigua.
     
-    finally:
-        if session:
-            session.close()
+    Los errores se propagan, para que no queden en caché.
+    """
+    # Consultar solo la columna de fechas (sin repetir, por si falta el índice único), leyendo por lotes
+    stmt = select(Report.date).distinct().order_by(Report.date.desc()).execution_options(yield_per=1000)
+    
+    with Session() as session:
+        return list(session.scalars(stmt))
+
+def list_reports():
+    """
+    Obtiene el listado de informes guardados con sus metadatos en una sola consulta.
+    
+    No carga el DataFrame serializado, solo su tamaño.
+    
+    Returns:
+        DataFrame con las columnas date, created_at, filename y size
+        (ordenado de más reciente a más antiguo)
+    """
+    columns = ['date', 'created_at', 'filename', 'size']
+    try:
+        with Session() as session:
+            rows = session.query(
+                Report.date,
+                Report.created_at,
+                Report.filename,
+                func.length(Report.dataframe).label('size')
+            ).order_by(Report.date.desc()).all()
+        
+        return pd.DataFrame(
+            [(row.date, row.created_at, row.filename, row.size) for row in rows],
+            columns=columns
+        )
+    
+    except Exception:
+        logger.exception("Error al obtener el listado de informes")
+        return pd.DataFrame(columns=columns)
 
 def delete_report_from_db(date):
     """
@@ -210,28 +661,17 @@ def delete_report_from_db(date):
     Returns:
         Boolean indicando éxito o fracaso
     """
-    session = None
     try:
-        session = Session()
+        # Eliminar en una sola sentencia y transacción, sin cargar el informe
+        with get_engine().begin() as connection:
+            result = connection.execute(_DELETE_BY_DATE, {'report_date': date})
         
-        # Buscar el informe por fecha
-        report = session.query(Report).filter(Report.date == date).first()
+        # El listado de fechas en caché ya no está al día
+        _query_saved_report_dates.clear()
+        _evict_cached_table(date)
         
-        if not report:
-            return False
-        
-        # Eliminar el informe
-        session.delete(report)
-        session.commit()
-        
-        return True
+        return result.rowcount > 0
     
-    except Exception as e:
-        print(f"Error al eliminar el informe de la base de datos: {str(e)}")
-        if session:
-            session.rollback()
+    except Exception:
+        logger.exception("Error al eliminar el informe de la base de datos")
         return False
-    
-    finally:
-        if session:
-            session.close()
\ No newline at end of file